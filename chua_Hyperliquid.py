@@ -1,19 +1,316 @@
 # -*- coding: utf-8 -*-
+import atexit
 import time
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import math
 import os
+import queue
 import socket
 import threading
-from logging.handlers import TimedRotatingFileHandler
+from types import MappingProxyType
+from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from logging.handlers import TimedRotatingFileHandler, QueueHandler, QueueListener
+
+import numpy as np
+import orjson
+
+try:
+    # 可选依赖：安装了 Numba 则把判断内核编译成机器码，否则用 numpy 向量化版本
+    from numba import njit
+except ImportError:
+    njit = None
 
 # Hyperliquid 依赖
 from eth_account import Account
 from hyperliquid.info import Info
 from hyperliquid.exchange import Exchange
 from hyperliquid.utils import constants
+from hyperliquid.websocket_manager import WebsocketManager, ws_msg_to_identifier
+from websocket._dispatcher import SSLDispatcher
+
+
+# 档位编号：判断只用整数，中文名称仅用于日志
+TIER_NONE, TIER_LOW, TIER_FIRST, TIER_SECOND = 0, 1, 2, 3
+TIER_LABELS = {
+    TIER_NONE: "未达标",
+    TIER_LOW: "低收益回撤保护",
+    TIER_FIRST: "第一档移动止盈",
+    TIER_SECOND: "第二档移动止盈",
+}
+
+
+# 单轮判断结果
+ACTION_HOLD, ACTION_TRAIL, ACTION_HARD = 0, 1, 2
+
+
+def _evaluate_numpy(roi, high, valid, thresholds, keep, hard_neg):
+    """向量化判断内核：返回 (档位下标, 动作)，档位下标 0 表示未达标"""
+    tier_idx = np.searchsorted(thresholds, high, side='right')
+    action = np.zeros(roi.shape[0], dtype=np.int8)
+    action[valid & (roi <= high * keep[tier_idx])] = ACTION_TRAIL
+    action[valid & (roi <= hard_neg)] = ACTION_HARD
+    return tier_idx, action
+
+
+def _evaluate_loop(roi, high, valid, thresholds, keep, hard_neg):
+    """与 _evaluate_numpy 等价的逐个循环写法，供 Numba 编译"""
+    n = roi.shape[0]
+    tier_idx = np.zeros(n, dtype=np.int64)
+    action = np.zeros(n, dtype=np.int8)
+    for i in range(n):
+        t = 0
+        while t < thresholds.shape[0] and thresholds[t] <= high[i]:
+            t += 1
+        tier_idx[i] = t
+        if not valid[i]:
+            continue
+        if roi[i] <= hard_neg:
+            action[i] = ACTION_HARD
+        elif t > 0 and roi[i] <= high[i] * keep[t]:
+            action[i] = ACTION_TRAIL
+    return tier_idx, action
+
+
+evaluate_positions = njit(cache=True)(_evaluate_loop) if njit else _evaluate_numpy
+
+
+# Redis 共享行情：mids_publisher.py 写入哈希并广播变动的币种价格
+MIDS_KEY = "shared:market:hyperliquid:mids"
+MIDS_CHANNEL = "mids:updates"
+
+
+@dataclass(slots=True, frozen=True)
+class Position:
+    """单个持仓的静态信息，只在持仓变化时创建且不再修改；价格和收益率放在列数组里"""
+    symbol: str
+    side: str
+    size: float
+    raw_size: float
+    entry_price: float
+
+
+class FastInfo(Info):
+    """REST 响应改用 orjson 解析，其余行为与 SDK 的 Info 一致"""
+
+    def post(self, url_path, payload=None):
+        payload = payload or {}
+        response = self.session.post(self.base_url + url_path, json=payload, timeout=self.timeout)
+        self._handle_exception(response)
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            return {"error": f"Could not parse JSON: {response.text}"}
+
+
+class BusyPollDispatcher(SSLDispatcher):
+    """零超时轮询 WS socket：有数据立即读取，不在内核里睡眠等待唤醒"""
+
+    def select(self, sock, sel):
+        if self.app.sock is None:
+            return None
+        sock = self.app.sock.sock
+        # SSL 层已解密但未读取的数据不会触发 socket 可读
+        if hasattr(sock, "pending") and sock.pending():
+            return sock
+        ready = sel.select(0)
+        return ready[0][0] if ready else None
+
+
+class RequestResultUnknown(Exception):
+    """请求已经发出，但没有拿到结果 (超时或连接中断)，不能当作失败直接重试"""
+
+
+class ReconnectingWebsocketManager(WebsocketManager):
+    """SDK 的 WS 断开后不会重连：这里按指数退避重连，并在重连后重新发送已有订阅"""
+
+    PING_INTERVAL = 30
+    MAX_RETRIES = 10
+    MAX_BACKOFF = 60
+
+    def __init__(self, base_url):
+        super().__init__(base_url)
+        self.subscriptions = []
+        self.connected_once = False
+        self.last_message_ts = 0
+        # 重连成功后的回调：断线期间的推送已丢失，由使用方重新同步状态
+        self.on_reconnect = None
+        # WS post 请求: id -> Future，由 on_message 收到同 id 的响应后完成
+        self.post_lock = threading.Lock()
+        self.post_id = 0
+        self.pending_posts = {}
+
+    def run(self):
+        self.ping_sender.start()
+        self.run_with_reconnect()
+
+    def run_with_reconnect(self):
+        logger = logging.getLogger("HyperliquidBot")
+        attempt = 0
+        while not self.stop_event.is_set():
+            self.ws.run_forever()
+            opened = self.ws_ready
+            self.ws_ready = False
+            self.fail_pending_posts()
+            if self.stop_event.is_set():
+                break
+            # 连上过就重新计数，只有连续失败才会耗尽重试次数
+            attempt = 1 if opened else attempt + 1
+            if attempt > self.MAX_RETRIES:
+                logger.error(f"❌ WebSocket 连续 {self.MAX_RETRIES} 次重连失败，放弃重连，由 REST 兜底")
+                break
+            delay = min(2 ** (attempt - 1), self.MAX_BACKOFF)
+            logger.warning(f"⚠️ WebSocket 已断开，{delay} 秒后第 {attempt}/{self.MAX_RETRIES} 次重连")
+            if self.stop_event.wait(delay):
+                break
+
+    def send_ping(self):
+        # 重连期间 keep_running 为 False，不能像 SDK 那样直接退出心跳线程
+        while not self.stop_event.wait(self.PING_INTERVAL):
+            if not self.ws_ready:
+                continue
+            # 两个心跳周期都没收到任何消息 (含 pong)，视为假死，主动断开触发重连
+            if time.time() - self.last_message_ts > 2 * self.PING_INTERVAL:
+                logging.getLogger("HyperliquidBot").warning("⚠️ WebSocket 心跳超时，主动断开重连")
+                self.ws.close()
+                continue
+            try:
+                self.ws.send(json.dumps({"method": "ping"}))
+            except Exception as e:
+                logging.debug(f"Websocket ping failed: {e}")
+
+    def on_message(self, _ws, message):
+        # 与 SDK 的分发逻辑一致，解析改用 orjson
+        self.last_message_ts = time.time()
+        if message == "Websocket connection established.":
+            return
+        ws_msg = orjson.loads(message)
+        # SDK 不处理 post 频道的响应，这里截下来交给等待中的请求
+        if ws_msg.get("channel") == "post":
+            self.resolve_post(ws_msg["data"])
+            return
+        identifier = ws_msg_to_identifier(ws_msg)
+        if identifier is None or identifier == "pong":
+            return
+        for active_subscription in self.active_subscriptions.get(identifier, ()):
+            active_subscription.callback(ws_msg)
+
+    def post_request(self, request_type, payload, timeout):
+        """通过已建立的 WS 连接发送 post 请求并等待响应
+        发送前失败抛 ConnectionError (可安全改走 HTTP)；已发出但超时或断线抛 RequestResultUnknown"""
+        if not self.ws_ready:
+            raise ConnectionError("WebSocket 未连接")
+        future = Future()
+        with self.post_lock:
+            self.post_id += 1
+            post_id = self.post_id
+            self.pending_posts[post_id] = future
+        try:
+            try:
+                self.ws.send(json.dumps({"method": "post", "id": post_id, "request": {"type": request_type, "payload": payload}}))
+            except Exception as e:
+                raise ConnectionError(f"WebSocket 发送失败: {e}") from e
+            try:
+                return future.result(timeout)
+            except FutureTimeoutError as e:
+                raise RequestResultUnknown(f"WS post 请求 {timeout} 秒未收到响应") from e
+        finally:
+            with self.post_lock:
+                self.pending_posts.pop(post_id, None)
+
+    def resolve_post(self, data):
+        with self.post_lock:
+            future = self.pending_posts.pop(data.get("id"), None)
+        if future is None or future.done():
+            return
+        response = data.get("response", {})
+        if response.get("type") == "error":
+            future.set_exception(RuntimeError(f"WS post 请求失败: {response.get('payload')}"))
+        else:
+            future.set_result(response.get("payload"))
+
+    def fail_pending_posts(self):
+        with self.post_lock:
+            pending, self.pending_posts = self.pending_posts, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(RequestResultUnknown("WebSocket 断开，请求结果未知"))
+
+    def on_open(self, _ws):
+        self.last_message_ts = time.time()
+        if not self.connected_once:
+            self.connected_once = True
+            super().on_open(_ws)
+            self.queued_subscriptions.clear()
+            return
+        # 回调仍在 active_subscriptions 里，只需向服务端重新发送订阅，避免回调重复注册
+        self.ws_ready = True
+        for subscription in self.subscriptions:
+            self.ws.send(json.dumps({"method": "subscribe", "subscription": subscription}))
+        logging.getLogger("HyperliquidBot").info(f"✅ WebSocket 已重连，恢复 {len(self.subscriptions)} 个订阅")
+        if self.on_reconnect:
+            self.on_reconnect()
+
+    def subscribe(self, subscription, callback, subscription_id=None):
+        if subscription not in self.subscriptions:
+            self.subscriptions.append(subscription)
+        return super().subscribe(subscription, callback, subscription_id)
+
+
+class BusyPollWebsocketManager(ReconnectingWebsocketManager):
+    """hft_mode 专用：读线程忙轮询并绑定到指定 CPU，用一个核的算力换行情延迟"""
+
+    def __init__(self, base_url, cpu=None):
+        super().__init__(base_url)
+        self.cpu = cpu
+        default_create = self.ws.create_dispatcher
+
+        def create_dispatcher(ping_timeout, dispatcher=None, *args, **kwargs):
+            if dispatcher:
+                return default_create(ping_timeout, dispatcher, *args, **kwargs)
+            return BusyPollDispatcher(self.ws, ping_timeout or 10)
+
+        self.ws.create_dispatcher = create_dispatcher
+
+    def run(self):
+        # ping 线程先启动，避免继承读线程的 CPU 绑定
+        self.ping_sender.start()
+        if self.cpu is not None and hasattr(os, "sched_setaffinity"):
+            try:
+                os.sched_setaffinity(0, {self.cpu})
+            except OSError as e:
+                logging.getLogger("HyperliquidBot").warning(f"⚠️ WS 读线程绑定 CPU {self.cpu} 失败: {e}")
+        self.run_with_reconnect()
+
+
+class WsExchange(Exchange):
+    """签名沿用 SDK，下单改走常驻的 WS 连接 (post 动作)，省掉 HTTPS 往返；WS 不可用时退回 HTTP"""
+
+    ws_trader = None
+    ws_timeout = 5
+
+    def _post_action(self, action, signature, nonce):
+        trader = self.ws_trader
+        if trader is None or not trader.ws_ready:
+            return super()._post_action(action, signature, nonce)
+        payload = {
+            "action": action,
+            "nonce": nonce,
+            "signature": signature,
+            "vaultAddress": self.vault_address if action["type"] not in ["usdClassTransfer", "sendAsset"] else None,
+            "expiresAfter": self.expires_after,
+        }
+        try:
+            return trader.post_request("action", payload, self.ws_timeout)
+        except ConnectionError as e:
+            # 请求没发出去，改走 HTTP 不会重复下单
+            logging.getLogger("HyperliquidBot").warning(f"⚠️ WS 下单不可用，改走 HTTP: {e}")
+            return super()._post_action(action, signature, nonce)
+
 
 class MultiAssetTradingBot:
     def __init__(self, config, feishu_webhook=None, monitor_interval=4):
@@ -23,6 +320,7 @@ class MultiAssetTradingBot:
         # 1. 策略参数加载
         self.leverage = float(config.get("leverage", 10))
         self.stop_loss_pct = config["stop_loss_pct"]
+        self._hard_stop_neg = -float(self.stop_loss_pct)
         
         # 移动止盈参数
         self.low_trail_stop_loss_pct = config["low_trail_stop_loss_pct"]
@@ -32,18 +330,98 @@ class MultiAssetTradingBot:
         self.low_trail_profit_threshold = config["low_trail_profit_threshold"]
         self.first_trail_profit_threshold = config["first_trail_profit_threshold"]
         self.second_trail_profit_threshold = config["second_trail_profit_threshold"]
+
+        # 档位表 (阈值, 回撤比例, 档位编号)，按阈值从高到低排列
+        self._tiers = tuple(sorted((
+            (self.low_trail_profit_threshold, self.low_trail_stop_loss_pct, TIER_LOW),
+            (self.first_trail_profit_threshold, self.trail_stop_loss_pct, TIER_FIRST),
+            (self.second_trail_profit_threshold, self.higher_trail_stop_loss_pct, TIER_SECOND),
+        ), key=lambda tier: tier[0], reverse=True))
+        # 升序的档位数组，供 np.searchsorted 一次定位全部持仓的档位 (0 = 未达标)
+        ascending_tiers = self._tiers[::-1]
+        self._tier_thresholds = np.array([tier[0] for tier in ascending_tiers], dtype=np.float64)
+        # 预先算好各档 (1 - 回撤比例)，循环内只剩一次乘法
+        self._tier_keep = np.array([np.nan] + [1 - tier[1] for tier in ascending_tiers], dtype=np.float64)
+        self._tier_ids = np.array([TIER_NONE] + [tier[2] for tier in ascending_tiers], dtype=np.int8)
         
+        if njit:
+            # 启动时先编译一次，避免第一次判断时卡在 JIT 上
+            evaluate_positions(np.empty(0), np.empty(0), np.empty(0, dtype=bool),
+                               self._tier_thresholds, self._tier_keep, self._hard_stop_neg)
+
         self.feishu_webhook = feishu_webhook
-        self.blacklist = set(config.get("blacklist", []))
+        self.blacklist = frozenset(config.get("blacklist", []))
         self.monitor_interval = monitor_interval
+        # WebSocket 推送超过该秒数未更新则退回 REST 轮询
+        self.ws_stale_timeout = config.get("ws_stale_timeout", 10)
+        # WebSocket 正常时，REST 兜底刷新的间隔 (秒)
+        self.rest_refresh_interval = config.get("rest_refresh_interval", 60)
+        # REST 结果缓存时间 (秒)：同一时间段内的重复查询直接用缓存
+        self.rest_cache_ttl = config.get("rest_cache_ttl", 1.0)
+        # SDK 每次 REST 请求的超时 (秒)，卡住的请求抛错，本轮跳过
+        self.rest_timeout = config.get("rest_timeout", 10)
+        # 配置后价格改读 mids_publisher.py 发布到 Redis 的共享行情，不再自己订阅 allMids
+        self.redis_url = config.get("redis_url")
+        # WS 下单等待回执的超时 (秒)
+        self.ws_trade_timeout = config.get("ws_trade_timeout", 5)
+        # 高频模式：WS 读线程忙轮询 + 绑核，会持续占满一个 CPU 核，仅建议独占服务器开启
+        self.hft_mode = config.get("hft_mode", False)
+        self.hft_cpu = config.get("hft_cpu")
 
         # 2. 初始化日志
         self.setup_logger()
 
+        # 全部 HTTP 请求 (SDK 的 REST、飞书) 共用一个会话和连接池，复用 TLS 连接
+        # POST 不是幂等方法，Retry 只重试连接阶段的失败，不会重复下单
+        self._http = requests.Session()
+        self._http.headers.update({"Content-Type": "application/json"})
+        self._http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(total=2, backoff_factor=0.2)))
+
+        # 飞书报警队列：后台线程合并发送，不阻塞监控循环
+        self._alert_q = queue.Queue()
+        if self.feishu_webhook:
+            threading.Thread(target=self._alert_worker, daemon=True).start()
+
         # 3. 看门狗相关变量
         self.last_heartbeat = time.time() # 上次心跳时间
         self.watchdog_started = False
 
+        # WebSocket 推送的最新快照 (由回调线程写入，主循环读取)
+        self._state_lock = threading.Lock()
+        self._latest_user_state = {}
+        self._latest_mids = {}
+        # 由 userFills 增量维护的持仓 {币种: (szi, entryPx)}，REST 定期校验
+        self._fill_positions = {}
+        self._last_fill_ts = 0
+        self._positions_synced = False
+        self._mids_ts = 0
+        self._last_rest_refresh = 0
+        self._resync_ts = 0
+        self._ws_degraded = False
+        # REST 结果短时缓存 {key: (时间戳, 结果)}，同一轮内的重复调用共享一次请求
+        self._rest_cache = {}
+        self._rest_cache_lock = threading.Lock()
+        # 持仓币种行情变动时唤醒主循环
+        self._tick = threading.Event()
+
+        # 持仓列式存储 (SoA)：仅在 user_state 变化时重建，每轮只刷新中间价并向量化计算
+        self._positions = []
+        self._positions_src = None
+        self._positions_key = None
+        self._positions_entries = {}
+        self._sym_to_idx = {}
+        self._entry = np.empty(0)
+        self._roi_scale = np.empty(0)
+        self._mids = np.empty(0)
+        self._roi = np.empty(0)
+        self._high = np.empty(0)
+        # _check_positions 每轮复用的快照缓冲区，长度随持仓重建
+        self._valid_buf = np.empty(0, dtype=bool)
+        self._roi_buf = np.empty(0)
+        self._high_buf = np.empty(0)
+        # 价格列或持仓每变化一次加一，主循环据此判断是否需要重新计算
+        self._price_version = 0
+
         # 4. Hyperliquid 连接配置
         self.wallet_address = config["wallet_address"] 
         
@@ -66,20 +444,57 @@ class MultiAssetTradingBot:
                 self.logger.info("✅ 模式确认: 正在使用 Agent 代理操作主钱包。")
             self.logger.info("-" * 40)
             
-            self.info = Info(constants.MAINNET_API_URL, skip_ws=True)
-            self.exchange = Exchange(
+            # WS 管理器自己创建，替换成带断线重连的版本
+            self.info = FastInfo(constants.MAINNET_API_URL, skip_ws=True, timeout=self.rest_timeout)
+            if self.hft_mode:
+                cpu = self.hft_cpu
+                if cpu is None and hasattr(os, "sched_getaffinity"):
+                    cpu = max(os.sched_getaffinity(0))
+                self.info.ws_manager = BusyPollWebsocketManager(self.info.base_url, cpu)
+                self.logger.info(f"⚡ 高频模式已开启: WS 读线程忙轮询，绑定 CPU {cpu}")
+            else:
+                self.info.ws_manager = ReconnectingWebsocketManager(self.info.base_url)
+            self.info.ws_manager.on_reconnect = self._on_ws_reconnect
+            self.info.ws_manager.start()
+            # HTTP 下单同样要有超时：否则卡住的请求会一直占着平仓线程，
+            # 超时 (ReadTimeout) 时按结果未知处理，不直接重试
+            self.exchange = WsExchange(
                 self.account, 
                 constants.MAINNET_API_URL, 
-                account_address=self.wallet_address 
+                account_address=self.wallet_address,
+                timeout=self.rest_timeout
             )
+            self.exchange.ws_trader = self.info.ws_manager
+            self.exchange.ws_timeout = self.ws_trade_timeout
+            # SDK 不支持传入 session，构造后替换成共用会话
+            self.info.session = self.exchange.session = self.exchange.info.session = self._http
             self.logger.info("✅ Hyperliquid 交易连接建立成功")
+
+            self.info.subscribe({"type": "userFills", "user": self.wallet_address}, self._on_user_fills)
+            if self.redis_url:
+                import redis  # 可选依赖，只有配置了 redis_url 才需要安装
+                self._redis = redis.Redis.from_url(self.redis_url, decode_responses=True)
+                threading.Thread(target=self._redis_mids_loop, daemon=True).start()
+                self.logger.info("✅ WebSocket 订阅已提交 (userFills)，价格读取 Redis 共享行情")
+            else:
+                self.info.subscribe({"type": "allMids"}, self._on_mids)
+                self.logger.info("✅ WebSocket 订阅已提交 (userFills + allMids)")
             
         except Exception as e:
             self.logger.error(f"❌ Hyperliquid 连接初始化失败: {e}")
             raise e
 
-        # 用于存储每个币种的最高收益率状态
-        self.trailing_states = {}
+        # 每个币种的最高收益率快照：只由主循环整体替换发布，其它线程直接读引用，无需加锁
+        self.trailing_states = MappingProxyType({})
+
+        # 平仓线程池：多个币种同时触发时并行下单
+        self._order_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="close")
+        # REST 兜底时 user_state 与 all_mids 并发拉取，耗时取两者较慢者而不是相加
+        self._rest_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rest")
+        # 平仓中的币种 {币种: 截止时间}，截止前或持仓更新前不重复下单
+        self._closing = {}
+        # 结果未知的平仓 {币种: 记录时间}，等下一次 REST 快照核对后解除
+        self._unconfirmed_closes = {}
 
     def setup_logger(self):
         self.logger = logging.getLogger("HyperliquidBot")
@@ -93,8 +508,14 @@ class MultiAssetTradingBot:
         handler.setFormatter(formatter)
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
-        self.logger.addHandler(console_handler)
+
+        # 日志先入队，由后台线程写文件和控制台，监控循环内不做磁盘 I/O
+        log_queue = queue.SimpleQueue()
+        self.logger.addHandler(QueueHandler(log_queue))
+        self._log_listener = QueueListener(log_queue, handler, console_handler, respect_handler_level=True)
+        self._log_listener.start()
+        # 正常退出时把队列里剩余的日志写完
+        atexit.register(self._log_listener.stop)
 
     # --- 看门狗线程函数 ---
     def _watchdog_loop(self):
@@ -105,97 +526,485 @@ class MultiAssetTradingBot:
             
             if gap > 60:
                 self.logger.error(f"💀 检测到主程序卡死 (已阻塞 {gap:.1f} 秒)，正在强制重启...")
+                # 最多等 3 秒把队列里的日志写完；写日志本身卡住也不能拖住重启
+                flusher = threading.Thread(target=self._log_listener.stop, daemon=True)
+                flusher.start()
+                flusher.join(timeout=3)
                 os._exit(1)
     # ---------------------------
 
+    # --- 飞书报警后台线程 ---
+    def _alert_worker(self):
+        while True:
+            batch = [self._alert_q.get()]
+            # 等 200ms 攒一批：同一轮多个币种连续平仓时合并成一条推送
+            time.sleep(0.2)
+            while len(batch) < 20:
+                try:
+                    batch.append(self._alert_q.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                payload = {"msg_type": "text", "content": {"text": "\n---\n".join(batch)}}
+                # Content-Type 已在共用会话上统一设置
+                self._http.post(self.feishu_webhook, data=orjson.dumps(payload), timeout=5)
+            except Exception as e:
+                self.logger.error(f"飞书报警发送失败: {e}")
+    # ---------------------------
+
     def send_feishu_alert(self, message):
         if not self.feishu_webhook:
             return
-        try:
-            payload = {"msg_type": "text", "content": {"text": message}}
-            requests.post(self.feishu_webhook, json=payload, timeout=5)
-        except Exception as e:
-            self.logger.error(f"飞书报警发送失败: {e}")
+        self._alert_q.put(message)
 
-    def get_positions_and_prices(self):
-        t_start = time.time() 
-        try:
-            user_state = self.info.user_state(self.wallet_address)
-            all_mids = self.info.all_mids()
-            
-            api_duration = time.time() - t_start
-            if api_duration > 2.0:
-                self.logger.warning(f"⚠️ 网络请求耗时过长: {api_duration:.2f}秒")
+    # --- WebSocket 推送回调 (运行在 WS 线程) ---
+    def _on_ws_reconnect(self):
+        # 重新订阅后 userFills 只回放快照 (会被忽略)，断线期间的成交要靠 REST 补齐
+        self._request_resync()
 
-            positions_raw = user_state.get('assetPositions', [])
-            active_positions = []
-            
-            for item in positions_raw:
-                pos = item['position']
-                coin = pos['coin']
-                size = float(pos['szi'])
-                
-                if size == 0:
-                    continue
-                    
-                entry_price = float(pos['entryPx'])
-                unrealized_pnl_val = float(pos['unrealizedPnl'])
-                
-                current_price = float(all_mids.get(coin, 0))
-                if current_price == 0:
+    def _request_resync(self):
+        """让主循环下一轮立即做一次 REST 核对，而不是等到下一个定期校验周期；
+        正在进行的拉取若早于此刻开始，不算完成这次核对"""
+        self._resync_ts = time.time()
+        self._tick.set()
+
+    def _on_user_fills(self, msg):
+        data = msg.get("data", {})
+        # 订阅时推送的历史成交不处理，持仓以启动时的 REST 快照为准
+        if data.get("isSnapshot") or not data.get("fills"):
+            return
+
+        blacklist = self.blacklist
+        with self._state_lock:
+            positions = dict(self._fill_positions)
+            for fill in data["fills"]:
+                coin = fill['coin']
+                # 现货成交 (@index 或 BASE/QUOTE) 不影响合约持仓；黑名单币种不跟踪
+                if coin in blacklist or coin.startswith("@") or "/" in coin:
                     continue
+                start = float(fill['startPosition'])
+                sz = float(fill['sz'])
+                px = float(fill['px'])
+                new_size = start + (sz if fill['side'] == "B" else -sz)
 
-                side = "LONG" if size > 0 else "SHORT"
-                
-                margin = (abs(size) * entry_price) / self.leverage
-                if margin > 0:
-                    profit_pct = (unrealized_pnl_val / margin) * 100
+                if abs(new_size) < 1e-12:
+                    positions.pop(coin, None)
+                elif start == 0 or (start > 0) != (new_size > 0) or coin not in positions:
+                    # 新开仓或反手：开仓价即成交价
+                    positions[coin] = (new_size, px)
+                elif abs(new_size) > abs(start):
+                    # 加仓：按数量加权平均开仓价
+                    entry = positions[coin][1]
+                    positions[coin] = (new_size, (abs(start) * entry + sz * px) / abs(new_size))
                 else:
-                    profit_pct = 0
-
-                active_positions.append({
-                    "symbol": coin,
-                    "side": side,
-                    "size": abs(size), 
-                    "raw_size": size,
-                    "entry_price": entry_price,
-                    "current_price": current_price,
-                    "profit_pct": profit_pct,
-                    "pnl_usdc": unrealized_pnl_val
-                })
-                
-            return active_positions
+                    # 减仓：开仓价不变
+                    positions[coin] = (new_size, positions[coin][1])
+
+            self._fill_positions = positions
+            self._latest_user_state = self._positions_to_user_state(positions)
+            self._last_fill_ts = time.time()
+
+        self._tick.set()
+
+    @staticmethod
+    def _positions_to_user_state(positions):
+        """把增量维护的持仓转成与 user_state 相同的结构，复用重建逻辑"""
+        return {"assetPositions": [
+            {"position": {"coin": coin, "szi": str(szi), "entryPx": str(entry)}}
+            for coin, (szi, entry) in positions.items()
+        ]}
+
+    def _parse_positions(self, user_state):
+        positions = {}
+        blacklist = self.blacklist
+        for item in user_state.get('assetPositions', []):
+            pos = item['position']
+            # 黑名单先于数值解析过滤，与增量持仓口径一致
+            if pos['coin'] in blacklist:
+                continue
+            szi = float(pos['szi'])
+            if szi != 0:
+                positions[pos['coin']] = (szi, float(pos['entryPx']))
+        return positions
+
+    @staticmethod
+    def _same_positions(a, b):
+        if a.keys() != b.keys():
+            return False
+        return all(
+            math.isclose(a[coin][0], b[coin][0], rel_tol=1e-9, abs_tol=1e-12)
+            and math.isclose(a[coin][1], b[coin][1], rel_tol=1e-6)
+            for coin in a
+        )
+
+    def _on_mids(self, msg):
+        mids = msg.get("data", {}).get("mids")
+        if mids is None:
+            return
+        self._apply_mids(mids)
+
+    def _apply_mids(self, mids, mirror=None):
+        """mids 为全量快照或只含变动币种的增量；增量需给出常驻的 mirror，合并后作为最新快照"""
+        changed = False
+        hard_stops = []
+        with self._state_lock:
+            if mirror is None:
+                self._latest_mids = mids
+            else:
+                mirror.update(mids)
+                self._latest_mids = mirror
+            self._mids_ts = time.time()
+
+            # 只对价格变动的持仓增量更新中间价、收益率和最高收益率
+            for coin, idx in self._sym_to_idx.items():
+                px = mids.get(coin)
+                if px is None:
+                    continue
+                mid = float(px)
+                if mid <= 0 or mid == self._mids[idx]:
+                    continue
+                roi = float((mid - self._entry[idx]) * self._roi_scale[idx])
+                high = max(float(self._high[idx]), roi)
+                self._mids[idx] = mid
+                self._roi[idx] = roi
+                self._high[idx] = high
+                changed = True
+                if roi <= self._hard_stop_neg:
+                    hard_stops.append((self._positions[idx], roi))
+
+            if changed:
+                self._price_version += 1
+
+        # 硬止损不等主循环，直接在回调里提交平仓；移动止盈统一由主循环的判断内核处理
+        for pos, roi in hard_stops:
+            self._submit_close(pos.symbol, pos.size, pos.side, f"触发硬止损 (当前: {roi:.2f}%)")
+
+        if changed:
+            self._tick.set()
+    # ---------------------------
+
+    def _redis_mids_loop(self):
+        """在本地镜像 Redis 里的共享中间价，每条变动消息只把增量合并进同一份镜像"""
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                try:
+                    pubsub.subscribe(MIDS_CHANNEL)
+                    # 先订阅再取全量，两步之间的变动不会丢
+                    mirror = self._redis.hgetall(MIDS_KEY)
+                    self._apply_mids(mirror)
+                    for message in pubsub.listen():
+                        self._apply_mids(orjson.loads(message["data"]), mirror)
+                finally:
+                    # 每次重连都是新的 pubsub，旧连接要还回去，否则每断一次漏一个连接
+                    pubsub.close()
+            except Exception as e:
+                self.logger.error(f"❌ Redis 共享行情中断: {e}，5 秒后重连")
+                time.sleep(5)
+
+    def _cached(self, key, fn, ttl=None):
+        """ttl 秒内相同 key 直接返回上次结果，默认用配置的 rest_cache_ttl"""
+        if ttl is None:
+            ttl = self.rest_cache_ttl
+        with self._rest_cache_lock:
+            hit = self._rest_cache.get(key)
+        if hit is not None and time.time() - hit[0] < ttl:
+            return hit[1]
+        value = fn()
+        with self._rest_cache_lock:
+            self._rest_cache[key] = (time.time(), value)
+        return value
+
+    def _invalidate_cache(self):
+        with self._rest_cache_lock:
+            self._rest_cache.clear()
+
+    def _refresh_from_rest(self, with_mids=True):
+        """REST 兜底：启动、WebSocket 断流时或定期校验时拉取完整快照，并核对增量持仓
+        with_mids=False 时只拉 user_state，价格沿用推送 (推送正常时的定期校验)"""
+        t_start = time.time()
+        # 每个请求都带 rest_timeout 超时 (含线程池里的 user_state)，卡住的请求抛错，不会一直占着线程
+        fetch_user_state = lambda: self.info.user_state(self.wallet_address)
+        if with_mids:
+            user_state_future = self._rest_pool.submit(self._cached, ('us', self.wallet_address), fetch_user_state)
+            all_mids = self._cached('mids', self.info.all_mids)
+            user_state = user_state_future.result()
+        else:
+            user_state = self._cached(('us', self.wallet_address), fetch_user_state)
+
+        api_duration = time.time() - t_start
+        if api_duration > 2.0:
+            self.logger.warning(f"⚠️ 网络请求耗时过长: {api_duration:.2f}秒")
+
+        rest_positions = self._parse_positions(user_state)
+        with self._state_lock:
+            if with_mids:
+                self._latest_mids = all_mids
+            if self._positions_synced and self._last_fill_ts > t_start:
+                # 请求期间收到了新成交，REST 快照可能落后，保留增量状态
+                pass
+            elif not self._same_positions(rest_positions, self._fill_positions):
+                if self._positions_synced:
+                    self.logger.warning(f"⚠️ 增量持仓与 REST 快照不一致，以 REST 为准: {self._fill_positions} -> {rest_positions}")
+                self._fill_positions = rest_positions
+                self._latest_user_state = user_state
+            self._positions_synced = True
+
+            # 结果未知的平仓单由这次 REST 快照核对：持仓与当前列数组一致说明没有成交，
+            # 解除在途标记允许重新触发；已变化的交给重建清除，重建前仍不会重复下单
+            for symbol, ts in list(self._unconfirmed_closes.items()):
+                if ts >= t_start:
+                    continue
+                held = self._positions_entries.get(symbol)
+                rest = rest_positions.get(symbol)
+                if held and rest and self._same_positions({symbol: held}, {symbol: rest}):
+                    del self._unconfirmed_closes[symbol]
+                    self._closing.pop(symbol, None)
+        # 记录拉取开始的时间：快照只反映这之前的状态
+        self._last_rest_refresh = t_start
+
+    def _rebuild_positions(self, user_state):
+        """持仓变化时重建索引和列数组，最高收益率通过 trailing_states 延续；持仓未变则跳过"""
+        self._positions_src = user_state
+        raw_positions = [item['position'] for item in user_state.get('assetPositions', [])]
+        key = tuple((pos['coin'], pos['szi'], pos['entryPx']) for pos in raw_positions)
+        if key == self._positions_key:
+            return False
+        old_entries = self._positions_entries
+        # 按数值比较：REST 与成交推送合成的快照数字格式不同
+        new_entries = {pos['coin']: (float(pos['szi']), float(pos['entryPx'])) for pos in raw_positions}
+        self._positions_key = key
+        self._positions_entries = new_entries
+
+        positions = []
+        for pos in raw_positions:
+            # 黑名单在重建时一次性过滤，不进入列数组和每轮判断
+            if pos['coin'] in self.blacklist:
+                continue
+            size = float(pos['szi'])
+            if size == 0:
+                continue
+
+            positions.append(Position(
+                symbol=pos['coin'],
+                side="LONG" if size > 0 else "SHORT",
+                size=abs(size),
+                raw_size=size,
+                entry_price=float(pos['entryPx'])
+            ))
+
+        n = len(positions)
+        # fromiter 按已知长度直接填充，不经过中间 list
+        entry = np.fromiter((pos.entry_price for pos in positions), dtype=np.float64, count=n)
+        side = np.sign(np.fromiter((pos.raw_size for pos in positions), dtype=np.float64, count=n))
+
+        with self._state_lock:
+            self._publish_trailing_states()
+            # 只有数量和开仓价都没变的持仓延续最高收益率；
+            # 已平仓、加减仓或反手的币种丢弃旧状态，避免重新开仓后继承旧峰值被立刻平掉
+            self.trailing_states = MappingProxyType({
+                symbol: high for symbol, high in self.trailing_states.items()
+                if symbol in new_entries and new_entries[symbol] == old_entries.get(symbol)
+            })
+
+            # 持仓已变化的币种说明平仓结果已到达，解除在途标记
+            for symbol in list(self._closing):
+                if new_entries.get(symbol) != old_entries.get(symbol):
+                    del self._closing[symbol]
+                    self._unconfirmed_closes.pop(symbol, None)
+
+            self._positions = positions
+            self._sym_to_idx = {pos.symbol: i for i, pos in enumerate(positions)}
+            self._entry = entry
+            self._roi_scale = np.divide(side * self.leverage * 100.0, entry, out=np.zeros(n), where=entry > 0)
+            self._mids = np.zeros(n)
+            self._roi = np.zeros(n)
+            states = self.trailing_states
+            self._high = np.fromiter((states.get(pos.symbol, -np.inf) for pos in positions), dtype=np.float64, count=n)
+            self._valid_buf = np.empty(n, dtype=bool)
+            self._roi_buf = np.empty(n)
+            self._high_buf = np.empty(n)
+            self._price_version += 1
+        return True
+
+    def _publish_trailing_states(self):
+        """把最高收益率列合并进新的快照并替换引用 (仅主循环调用，调用方需持有 _state_lock)"""
+        states = dict(self.trailing_states)
+        # 一次转成 Python float 列表，循环里不再逐个构造 numpy 标量
+        highs = self._high.tolist()
+        for symbol, idx in self._sym_to_idx.items():
+            high = highs[idx]
+            if high > -math.inf:
+                states[symbol] = high
+            else:
+                # 已平仓重置的币种不再沿用旧的最高收益率
+                states.pop(symbol, None)
+        self.trailing_states = MappingProxyType(states)
+
+    def _fill_mids(self):
+        """用最新的完整中间价快照重算整列 (重建持仓或 REST 刷新后)"""
+        positions = self._positions
+        with self._state_lock:
+            # 在锁内读取最新快照：调用前读到的旧快照可能已被 _on_mids 的新价格取代
+            all_mids = self._latest_mids
+            mids = np.fromiter((all_mids.get(pos.symbol, 0) for pos in positions), dtype=np.float64, count=len(positions))
+            if np.array_equal(mids, self._mids):
+                return
+            self._mids = mids
+            self._price_version += 1
+            # 浮盈率 = (中间价 - 开仓价) * 方向 * 杠杆 * 100 / 开仓价，与 未实现盈亏 / 保证金 * 100 等价
+            self._roi = (self._mids - self._entry) * self._roi_scale
+
+    def get_positions_and_prices(self):
+        try:
+            refreshed = False
+            now = time.time()
+            # allMids 持续推送，以它判断 WebSocket 是否存活；userFills 只在成交时推送
+            ws_age = now - self._mids_ts
+            if ws_age > self.ws_stale_timeout:
+                if not self._ws_degraded and self._mids_ts:
+                    self.logger.warning(f"⚠️ WebSocket 推送已 {ws_age:.1f} 秒未更新，改用 REST 拉取")
+                    self._ws_degraded = True
+                self._refresh_from_rest()
+                refreshed = True
+            else:
+                if self._ws_degraded:
+                    self.logger.info("✅ WebSocket 推送已恢复")
+                    self._ws_degraded = False
+                if now - self._last_rest_refresh >= self.rest_refresh_interval or self._last_rest_refresh < self._resync_ts:
+                    # 推送的价格是新的，定期校验只需核对持仓，省掉一次 all_mids 请求
+                    self._refresh_from_rest(with_mids=False)
+                    refreshed = True
+
+            with self._state_lock:
+                user_state = self._latest_user_state
+
+            if user_state is not self._positions_src and self._rebuild_positions(user_state):
+                refreshed = True
+            if not self._positions:
+                return []
+
+            # WebSocket 正常时由 _on_mids 增量维护价格列，这里只在全量快照时重算
+            if refreshed:
+                self._fill_mids()
+            return self._positions
             
         except Exception as e:
             self.logger.error(f"❌ 获取数据失败 (保持状态): {e}")
             return None 
 
+    def _submit_close(self, symbol, size, side, reason):
+        """平仓单交给线程池发送；同一币种在途或刚平仓未确认时不重复提交"""
+        now = time.time()
+        with self._state_lock:
+            if self._closing.get(symbol, 0) > now:
+                return False
+            # 在途期间不设截止时间：下单耗时没有上限，到期放开会在前一单未返回时重复下单；
+            # 由 _close_worker 在下单返回后改成等待确认的截止时间
+            self._closing[symbol] = math.inf
+        self._order_pool.submit(self._close_worker, symbol, size, side, reason)
+        return True
+
+    def _close_worker(self, symbol, size, side, reason):
+        ok = self.close_position(symbol, size, side, reason)
+        with self._state_lock:
+            if ok is None:
+                # 结果未知：平仓单可能已成交，而下单不是 reduce-only，直接重试可能反向开仓。
+                # 保持在途标记，立即安排一次 REST 核对持仓，核对完成后再决定是否允许重试
+                self._closing[symbol] = math.inf
+                self._unconfirmed_closes[symbol] = time.time()
+                self._request_resync()
+            elif not ok:
+                self._closing.pop(symbol, None)
+            elif symbol in self._closing:
+                # 等待持仓推送确认，超时仍未变化则允许再次触发；
+                # 成交推送可能先于下单回执到达，标记已被重建清除时不再重新设置
+                self._closing[symbol] = time.time() + self.ws_stale_timeout
+
     def close_position(self, symbol, size, side, reason=""):
+        """返回 True 平仓成功，False 未成交可重试，None 已发出但结果未知"""
         try:
             self.logger.info(f"正在平仓 {symbol}: 数量 {size}, 方向 {side} ({reason})")
             
             is_buy = True if side == "SHORT" else False
+
+            # 直接用推送的中间价计算滑点价，SDK 不必再 REST 拉一次 all_mids
+            mid = self._latest_mids.get(symbol)
             
             result = self.exchange.market_open(
                 name=symbol,
                 is_buy=is_buy,
                 sz=size,
+                px=float(mid) if mid else None,
                 slippage=0.02
             )
             
+            # 持仓已变化，丢弃 REST 缓存
+            self._invalidate_cache()
+
             if result['status'] == 'ok':
                 msg = f"✅ {symbol} 平仓成功! 原因: {reason}"
                 self.logger.info(msg)
                 self.send_feishu_alert(msg)
                 
-                if symbol in self.trailing_states:
-                    del self.trailing_states[symbol]
+                # 只重置列数组，trailing_states 快照由主循环下次发布时同步
+                with self._state_lock:
+                    idx = self._sym_to_idx.get(symbol)
+                    if idx is not None:
+                        self._high[idx] = -np.inf
+                return True
             else:
                 self.logger.error(f"❌ {symbol} 平仓失败: {result}")
                 
+        except (RequestResultUnknown, requests.exceptions.ReadTimeout) as e:
+            # 请求已发出但没有回执，持仓可能已经变化
+            self._invalidate_cache()
+            msg = f"❓ {symbol} 平仓结果未知: {e}，核对持仓后再决定是否重试"
+            self.logger.error(msg)
+            self.send_feishu_alert(msg)
+            return None
         except Exception as e:
             self.logger.error(f"平仓异常 {symbol}: {e}")
             self.send_feishu_alert(f"⚠️ 平仓异常 {symbol}: {e}")
+        return False
+
+    def _check_positions(self, positions, log_status):
+        """对全部持仓做一次止盈止损判断"""
+        # 向量化：一次更新全部持仓的最高收益率、档位和触发掩码
+        # 快照写进预分配的缓冲区，每轮不再新建数组 (只有主循环调用，缓冲区不会并发使用)
+        valid, roi, high = self._valid_buf, self._roi_buf, self._high_buf
+        with self._state_lock:
+            np.greater(self._mids, 0, out=valid)
+            np.copyto(roi, self._roi)
+            np.maximum(self._high, roi, out=self._high, where=valid)
+            np.copyto(high, self._high)
+            if log_status:
+                self._publish_trailing_states()
+        tier_idx, action = evaluate_positions(roi, high, valid, self._tier_thresholds, self._tier_keep, self._hard_stop_neg)
+        tier = self._tier_ids[tier_idx]
+
+        submit_close = self._submit_close
+        for i in np.nonzero(action)[0]:
+            pos = positions[i]
+            profit_pct = roi[i]
+            if action[i] == ACTION_HARD:
+                reason = f"触发硬止损 (当前: {profit_pct:.2f}%)"
+            else:
+                reason = f"触发{TIER_LABELS[tier[i]]} (最高: {high[i]:.2f}%, 当前: {profit_pct:.2f}%)"
+            submit_close(pos.symbol, pos.size, pos.side, reason)
+
+        # --- 只要有持仓，每个监控间隔打印一次 ---
+        if log_status and self.logger.isEnabledFor(logging.INFO):
+            # 循环内用到的属性先绑定到局部变量
+            closing = self._closing
+            log_info = self.logger.info
+            labels = TIER_LABELS
+            for i, pos in enumerate(positions):
+                symbol = pos.symbol
+                if not valid[i] or symbol in closing:
+                    continue
+                log_info("监控中: %s | 方向: %s | 盈亏: %.2f%% | 最高: %.2f%% | 档位: %s",
+                         symbol, pos.side, roi[i], high[i], labels[tier[i]])
 
     def trail(self):
         """核心监控循环"""
@@ -207,6 +1016,9 @@ class MultiAssetTradingBot:
             self.watchdog_started = True
 
         idle_count = 0
+        last_status_log = 0
+        last_price_version = -1
+        next_deadline = time.monotonic()
         
         while True:
             self.last_heartbeat = time.time()
@@ -221,80 +1033,38 @@ class MultiAssetTradingBot:
                     
                 elif not positions:
                     # 场景 1：无持仓 -> 保持静默，每60秒心跳
-                    self.trailing_states.clear()
+                    self.trailing_states = MappingProxyType({})
                     if idle_count % 15 == 0:
-                        self.logger.info(f"💓 监控运行中... 当前无持仓 (等待新开仓)")
+                        self.logger.info("💓 监控运行中... 当前无持仓 (等待新开仓)")
                     idle_count += 1
                 
                 else:
-                    # 场景 2：有持仓 -> 无论波动大小，每4秒强制打印
+                    # 场景 2：有持仓 -> 行情推送即判断，日志按监控间隔打印
                     idle_count = 0
-                    for pos in positions:
-                        symbol = pos['symbol']
-                        profit_pct = pos['profit_pct']
-                        side = pos['side']
-                        size = pos['size']
-                        
-                        if symbol in self.blacklist:
-                            continue
-
-                        if symbol not in self.trailing_states:
-                            self.trailing_states[symbol] = profit_pct
-                        else:
-                            if profit_pct > self.trailing_states[symbol]:
-                                self.trailing_states[symbol] = profit_pct
-                        
-                        highest_profit = self.trailing_states[symbol]
-
-                        current_tier = "未达标"
-                        if highest_profit >= self.second_trail_profit_threshold:
-                            current_tier = "第二档移动止盈"
-                        elif highest_profit >= self.first_trail_profit_threshold:
-                            current_tier = "第一档移动止盈"
-                        elif highest_profit >= self.low_trail_profit_threshold:
-                            current_tier = "低收益回撤保护"
-
-                        if current_tier == "低收益回撤保护":
-                            trail_stop_loss = highest_profit * (1 - self.low_trail_stop_loss_pct)
-                            if profit_pct <= trail_stop_loss:
-                                self.close_position(symbol, size, side, 
-                                    f"触发低收益保护 (最高: {highest_profit:.2f}%, 当前: {profit_pct:.2f}%)")
-                                continue
-
-                        elif current_tier == "第一档移动止盈":
-                            trail_stop_loss = highest_profit * (1 - self.trail_stop_loss_pct)
-                            if profit_pct <= trail_stop_loss:
-                                self.close_position(symbol, size, side, 
-                                    f"触发第一档移动止盈 (最高: {highest_profit:.2f}%, 当前: {profit_pct:.2f}%)")
-                                continue
-
-                        elif current_tier == "第二档移动止盈":
-                            trail_stop_loss = highest_profit * (1 - self.higher_trail_stop_loss_pct)
-                            if profit_pct <= trail_stop_loss:
-                                self.close_position(symbol, size, side, 
-                                    f"触发第二档移动止盈 (最高: {highest_profit:.2f}%, 当前: {profit_pct:.2f}%)")
-                                continue
-
-                        if profit_pct <= -self.stop_loss_pct:
-                            self.close_position(symbol, size, side, 
-                                f"触发硬止损 (当前: {profit_pct:.2f}%)")
-                            continue
-                            
-                        # --- 修改：只要有持仓，强制打印每一条日志 ---
-                        self.logger.info(f"监控中: {symbol} | 方向: {side} | 盈亏: {profit_pct:.2f}% | 最高: {highest_profit:.2f}% | 档位: {current_tier}")
+                    log_status = cycle_start_time - last_status_log >= self.monitor_interval
+                    if log_status:
+                        last_status_log = cycle_start_time
+                    # 价格和持仓都没变时跳过判断，打印节拍上仍完整跑一遍
+                    if log_status or self._price_version != last_price_version:
+                        last_price_version = self._price_version
+                        self._check_positions(positions, log_status)
 
             except Exception as e:
                 self.logger.error(f"监控循环发生错误: {e}")
             
             self.last_heartbeat = time.time()
 
-            elapsed = time.time() - cycle_start_time 
-            sleep_time = self.monitor_interval - elapsed
-            
-            if sleep_time > 0:
-                time.sleep(sleep_time) 
-            else:
-                self.logger.warning(f"⚡ 本轮耗时 ({elapsed:.2f}s) 超过设定间隔，跳过睡眠")
+            # 兜底轮询按单调时钟的固定节拍推进，不受单轮耗时影响而漂移
+            now = time.monotonic()
+            if now >= next_deadline:
+                next_deadline += self.monitor_interval
+                if next_deadline <= now:
+                    self.logger.warning("⚡ 本轮耗时 (%.2fs) 超过设定间隔，跳过睡眠", time.time() - cycle_start_time)
+                    next_deadline = now + self.monitor_interval
+
+            # 持仓币种价格变动会提前唤醒，到截止时间则作为兜底轮询
+            self._tick.wait(max(0, next_deadline - time.monotonic()))
+            self._tick.clear()
 
 if __name__ == '__main__':
     try:
@@ -302,8 +1072,8 @@ if __name__ == '__main__':
         os.chdir(os.path.dirname(os.path.abspath(__file__)))
         print(f"当前工作目录: {os.getcwd()}")
 
-        with open('config.json', 'r') as f:
-            all_config = json.load(f)
+        with open('config.json', 'rb') as f:
+            all_config = orjson.loads(f.read())
             
         if 'hyperliquid' in all_config:
             print("💡 正在加载 config.json 中的 [hyperliquid] 配置块...")
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Hyperliquid 共享行情发布器
+单独维持一条 allMids 推送，把中间价写进 Redis 哈希并广播变动的币种价格。
+同一台机器上的多个机器人在 hyperliquid 配置块里填上 redis_url 后直接读共享行情，不再各自订阅。
+"""
+import os
+import logging
+
+import orjson
+import redis
+
+from hyperliquid.utils import constants
+from chua_Hyperliquid import ReconnectingWebsocketManager, MIDS_KEY, MIDS_CHANNEL
+
+
+class MidsPublisher:
+    def __init__(self, redis_url):
+        self.logger = logging.getLogger("MidsPublisher")
+        self.redis = redis.Redis.from_url(redis_url)
+        self.last_mids = {}
+
+    def on_mids(self, msg):
+        mids = msg.get("data", {}).get("mids")
+        if not mids:
+            return
+        # 只写入和广播价格有变动的币种
+        last_mids = self.last_mids
+        changed = {coin: px for coin, px in mids.items() if last_mids.get(coin) != px}
+        self.last_mids = mids
+        if not changed:
+            return
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hset(MIDS_KEY, mapping=changed)
+        pipe.publish(MIDS_CHANNEL, orjson.dumps(changed))
+        try:
+            pipe.execute()
+        except redis.RedisError as e:
+            self.logger.error(f"❌ 写入 Redis 失败: {e}")
+            # 下次推送全量重写，保证哈希里的价格完整
+            self.last_mids = {}
+
+    def run(self):
+        ws_manager = ReconnectingWebsocketManager(constants.MAINNET_API_URL)
+        ws_manager.subscribe({"type": "allMids"}, self.on_mids)
+        ws_manager.start()
+        self.logger.info(f"🚀 共享行情发布已启动 -> {MIDS_KEY}")
+        ws_manager.join()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+        with open('config.json', 'rb') as f:
+            all_config = orjson.loads(f.read())
+        redis_url = all_config.get('hyperliquid', all_config).get('redis_url', 'redis://localhost:6379/0')
+
+        MidsPublisher(redis_url).run()
+    except FileNotFoundError:
+        print("❌ 错误: 找不到 config.json 文件")
+    except Exception as e:
+        print(f"❌ 程序启动失败: {e}")